@@ -46,24 +46,52 @@ EXAMPLES = '''
 '''
 
 from ansible.module_utils.basic import AnsibleModule
+from array import array
 import datetime
+import multiprocessing
+import os
 import re
 import json
 import logging
+import math
+
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps_json(obj):
+    """Serialize obj to JSON bytes, using orjson when it is available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode('utf-8')
+
 
 class DSLogParser:
     REGEX_TIMESTAMP = re.compile(
         r'\[(?P<day>\d*)\/(?P<month>\w*)\/(?P<year>\d*):(?P<hour>\d*):(?P<minute>\d*):(?P<second>\d*)(\.(?P<nanosecond>\d*))+\s(?P<tz>[\+\-]\d{2})(?P<tz_minute>\d{2})'
     )
-    REGEX_LINE = re.compile(
-        r'\s(?P<quoted>[^= ]+="[^"]*")|(?P<var>[^= ]+=[^\s]+)|(?P<keyword>[^\s]+)'
-    )
     MONTH_LOOKUP = {
         'Jan': "01", 'Feb': "02", 'Mar': "03", 'Apr': "04", 'May': "05", 'Jun': "06",
         'Jul': "07", 'Aug': "08", 'Sep': "09", 'Oct': "10", 'Nov': "11", 'Dec': "12"
     }
+    MONTH_IDX = {
+        'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+        'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+    }
+    TZ_CACHE = {}
+    EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    TS_CACHE_SIZE = 65536
+    READ_BUFFER_SIZE = 1 << 20
+    # Raw lines not containing this bytes marker are skipped before parsing
+    LINE_FILTER = None
 
     class ParserResult:
+        __slots__ = ('keywords', 'vars', 'raw', 'timestamp')
+
         def __init__(self):
             self.keywords = []
             self.vars = {}
@@ -74,45 +102,136 @@ class DSLogParser:
         self.logname = logname
         self.lineno = 0
         self.line = None
+        self._ts_cache = {}
 
     def parse_timestamp(self, ts):
         """Parse a log's timestamp and convert it to a datetime object."""
+        return self.parse_timestamp_utc(ts)[0]
+
+    def parse_timestamp_utc(self, ts):
+        """Parse a log's timestamp and return it as a (datetime, UTC epoch seconds) pair."""
+        try:
+            return self._parse_timestamp_cached(ts)
+        except (ValueError, KeyError, IndexError):
+            dt = self._parse_timestamp_regex(ts)
+            return (dt, (dt - self.EPOCH).total_seconds())
+
+    def _parse_timestamp_cached(self, ts):
+        """Parse a timestamp with the fast parser, caching all but its fraction of a second.
+
+        Result lines hardly ever share a full timestamp, but many share the same second.
+        """
+        if ts[21] != '.':
+            dt = self._parse_timestamp_fast(ts)
+            return (dt, (dt - self.EPOCH).total_seconds())
+        space = ts.index(' ', 22)
+        key = ts[:21] + ts[space:]
+        second = self._ts_cache.get(key)
+        if second is None:
+            dt = self._parse_timestamp_fast(key)
+            delta = dt - self.EPOCH
+            second = (dt, delta.days * 86400 + delta.seconds)
+            if len(self._ts_cache) >= self.TS_CACHE_SIZE:
+                self._ts_cache.clear()
+            self._ts_cache[key] = second
+        dt, seconds = second
+        microsecond = int(ts[22:space]) // 1000
+        # The same arithmetic as timedelta.total_seconds(), so the result is identical
+        return (dt.replace(microsecond=microsecond), (seconds * 10**6 + microsecond) / 10**6)
+
+    def _parse_timestamp_fast(self, ts):
+        """Parse the fixed '[DD/Mon/YYYY:HH:MM:SS.nnnnnnnnn +HHMM]' layout by offsets."""
+        if ts[0] != '[' or ts[3] != '/' or ts[7] != '/' or ts[12] != ':':
+            raise ValueError(f'Unexpected timestamp layout {ts}')
+        space = ts.index(' ', 21)
+        microsecond = int(ts[22:space]) // 1000 if ts[21] == '.' else 0
+        tz_minutes = int(ts[space + 2:space + 4]) * 60 + int(ts[space + 4:space + 6])
+        if ts[space + 1] == '-':
+            tz_minutes = -tz_minutes
+        tzinfo = self.TZ_CACHE.get(tz_minutes)
+        if tzinfo is None:
+            tzinfo = datetime.timezone(datetime.timedelta(minutes=tz_minutes))
+            self.TZ_CACHE[tz_minutes] = tzinfo
+        return datetime.datetime(
+            int(ts[8:12]), self.MONTH_IDX[ts[4:7]], int(ts[1:3]),
+            int(ts[13:15]), int(ts[16:18]), int(ts[19:21]), microsecond, tzinfo
+        )
+
+    def _parse_timestamp_regex(self, ts):
+        """Parse a timestamp with REGEX_TIMESTAMP, used when the fast path fails."""
         try:
-            timedata = self.REGEX_TIMESTAMP.match(ts).groupdict()
+            day, month, year, hour, minute, second, nanosecond, tz, tz_minute = self.REGEX_TIMESTAMP.match(ts).group(
+                'day', 'month', 'year', 'hour', 'minute', 'second', 'nanosecond', 'tz', 'tz_minute'
+            )
         except AttributeError as e:
-            logging.error(f'Failed to parse timestamp {ts} because of {e}')
+            logging.error('Failed to parse timestamp %s because of %s', ts, e)
             raise
 
         iso_ts = '{YEAR}-{MONTH}-{DAY}T{HOUR}:{MINUTE}:{SECOND}{TZH}:{TZM}'.format(
-            YEAR=timedata['year'], MONTH=self.MONTH_LOOKUP[timedata['month']],
-            DAY=timedata['day'], HOUR=timedata['hour'], MINUTE=timedata['minute'],
-            SECOND=timedata['second'], TZH=timedata['tz'], TZM=timedata['tz_minute']
+            YEAR=year, MONTH=self.MONTH_LOOKUP[month], DAY=day, HOUR=hour,
+            MINUTE=minute, SECOND=second, TZH=tz, TZM=tz_minute
         )
         dt = datetime.datetime.fromisoformat(iso_ts)
-        if timedata['nanosecond']:
-            dt = dt.replace(microsecond=int(timedata['nanosecond']) // 1000)
+        if nanosecond:
+            dt = dt.replace(microsecond=int(nanosecond) // 1000)
         return dt
 
+    @staticmethod
+    def tokenize(text):
+        """Split the part of a line after the timestamp into tokens.
+
+        Tokens are separated by whitespace except inside key="quoted value" pairs.
+        """
+        if '"' not in text:
+            return text.split()
+        tokens = []
+        parts = text.strip().split(' ')
+        nparts = len(parts)
+        i = 0
+        while i < nparts:
+            part = parts[i]
+            i += 1
+            if not part:
+                continue
+            eq = part.find('=')
+            if eq > 0 and part[eq + 1:eq + 2] == '"':
+                quoted = part
+                j = i
+                close = quoted.find('"', eq + 2)
+                while close < 0 and j < nparts:
+                    quoted = f'{quoted} {parts[j]}'
+                    j += 1
+                    close = quoted.find('"', eq + 2)
+                if close >= 0:
+                    i = j
+                    tokens.append(quoted[:close + 1])
+                    if close + 1 < len(quoted):
+                        tokens.append(quoted[close + 1:])
+                    continue
+            tokens.append(part)
+        return tokens
+
     def parse_line(self):
+        if not self.line or self.line[0] != '[':
+            return None
         l = self.line.split(']', 1)
         if len(l) != 2:
             return None
-        result = self.REGEX_LINE.findall(l[1])
-        if not result:
+        tokens = self.tokenize(l[1])
+        if not tokens:
             return None
 
         r = self.ParserResult()
         r.timestamp = l[0] + "]"
-        r.raw = result
-        for (quoted, var, keyword) in result:
-            if quoted:
-                key, value = quoted.split('=', 1)
-                r.vars[key] = value.strip('"')
-            if var:
-                key, value = var.split('=', 1)
+        r.raw = tokens
+        for token in tokens:
+            key, _, value = token.partition('=')
+            if key and value:
+                if value[0] == '"' and value[-1] == '"' and len(value) > 1:
+                    value = value[1:-1]
                 r.vars[key] = value
-            if keyword:
-                r.keywords.append(keyword)
+            else:
+                r.keywords.append(token)
         return r
 
     def action(self, r):
@@ -120,16 +239,31 @@ class DSLogParser:
 
     def parse_file(self):
         """Parse the log file."""
-        with open(self.logname, 'r') as f:
-            for self.line in f:
-                self.lineno += 1
+        line_filter = self.LINE_FILTER
+        with open(self.logname, 'rb', buffering=self.READ_BUFFER_SIZE) as f:
+            if hasattr(os, 'posix_fadvise'):
+                # The log is read once from start to end; ask for a larger readahead window
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            parse_line = self.parse_line
+            action = self.action
+            lineno = self.lineno
+            for lineno, raw_line in enumerate(f, lineno + 1):
+                if line_filter is not None and line_filter not in raw_line:
+                    continue
+                self.lineno = lineno
+                self.line = raw_line.decode('utf-8')
                 try:
-                    r = self.parse_line()
+                    r = parse_line()
                     if r:
-                        self.action(r)
+                        action(r)
                 except Exception as e:
-                    logging.error(f"Skipping non-parsable line {self.lineno} ==> {self.line} ==> {e}")
+                    logging.error("Skipping non-parsable line %d ==> %s ==> %s", self.lineno, self.line, e)
                     raise
+            self.lineno = lineno
+        self._ts_cache.clear()
 
 
 class ReplLag:
@@ -138,51 +272,142 @@ class ReplLag:
         self.logfiles = args['logfiles']
         self.anonymous = args['anonymous']
         self.nbfiles = len(args['logfiles'])
-        self.csns = {}
+        # Parsed CSN lines are stored column-wise, one row per line,
+        # and only turned into the nested "lag" mapping by write_result()
+        self.csn_column = []
+        self.idx_column = array('i')
+        self.logtime_column = array('d')
+        self.etime_column = array('d')
         self.start_udt = None  
         self.start_dt = None  
 
     class Parser(DSLogParser):
+        LINE_FILTER = b' csn='
+
         def __init__(self, server_name, idx, logfile, result):
             super().__init__(logfile)
             self.result = result
             self.idx = idx
             self.srv_name = server_name
+            self.start_udt = float('inf')
+            self.start_dt = None
+            # Bound appends of the result columns, called once per CSN line
+            self.add_csn = result.csn_column.append
+            self.add_idx = result.idx_column.append
+            self.add_logtime = result.logtime_column.append
+            self.add_etime = result.etime_column.append
 
         def action(self, r):
+            line_vars = r.vars
             try:
-                csn = r.vars['csn']
-                dt = self.parse_timestamp(r.timestamp)
-                udt = dt.astimezone(datetime.timezone.utc).timestamp()
-                if self.result.start_udt is None or self.result.start_udt > udt:
-                    self.result.start_udt = udt
-                    self.result.start_dt = dt
-                if csn not in self.result.csns:
-                    self.result.csns[csn] = {}
-                record = {"logtime": udt, "etime": r.vars['etime'], "server_name": self.srv_name}
-                self.result.csns[csn][self.idx] = record
-            except KeyError:
-                pass
+                csn = line_vars['csn']
+                dt, udt = self.parse_timestamp_utc(r.timestamp)
+                if udt < self.start_udt:
+                    self.start_udt = udt
+                    self.start_dt = dt
+                etime = float(line_vars['etime'])
+            except (KeyError, ValueError):
+                return
+            # float() also reads nan and inf, which would not be valid JSON
+            if not math.isfinite(etime):
+                return
+            self.add_csn(csn)
+            self.add_idx(self.idx)
+            self.add_logtime(udt)
+            self.add_etime(etime)
+
+        def parse_file(self):
+            super().parse_file()
+            # Fold this file's earliest timestamp into the overall start time
+            result = self.result
+            if self.start_dt is not None and (result.start_udt is None or result.start_udt > self.start_udt):
+                result.start_udt = self.start_udt
+                result.start_dt = self.start_dt
 
     def parse_files(self):
-        """Parse all log files."""
-        for idx, f in enumerate(self.logfiles):
-            parser = self.Parser(self.server_name, idx, f, self)
-            parser.parse_file()
-
-    def build_result(self):
-        """Build the result object for Ansible."""
-        obj = {
-            "start-time": str(self.start_dt),
-            "utc-start-time": self.start_udt,
-            "utc-offset": self.start_dt.utcoffset().total_seconds(),
-            "lag": self.csns
+        """Parse all log files, one worker process per file when there are several."""
+        if self.nbfiles < 2:
+            for idx, f in enumerate(self.logfiles):
+                parser = self.Parser(self.server_name, idx, f, self)
+                parser.parse_file()
+            return
+
+        jobs = [(self.server_name, idx, f) for idx, f in enumerate(self.logfiles)]
+        # Forked workers inherit the module as Ansible loaded it; spawn/forkserver would re-import it
+        context = multiprocessing.get_context('fork')
+        with context.Pool(processes=min(self.nbfiles, os.cpu_count() or 1)) as pool:
+            results = pool.map(_parse_log_file, jobs)
+
+        # Merge in file order so the result matches a sequential parse
+        for columns, start_udt, start_dt in results:
+            csns, idxs, logtimes, etimes = columns
+            self.csn_column.extend(csns)
+            self.idx_column.extend(idxs)
+            self.logtime_column.extend(logtimes)
+            self.etime_column.extend(etimes)
+            if start_udt is not None and (self.start_udt is None or self.start_udt > start_udt):
+                self.start_udt = start_udt
+                self.start_dt = start_dt
+
+    def columns(self):
+        """Return the parsed rows as (csns, idxs, logtimes, etimes) columns."""
+        return self.csn_column, self.idx_column, self.logtime_column, self.etime_column
+
+    def group_rows(self):
+        """Map each CSN to its rows in the parsed columns, in first-seen order."""
+        rows_by_csn = {}
+        for row, csn in enumerate(self.csn_column):
+            rows = rows_by_csn.get(csn)
+            if rows is None:
+                rows_by_csn[csn] = [row]
+            else:
+                rows.append(row)
+        return rows_by_csn
+
+    def build_header(self):
+        """Build the fields preceding "lag" in the result object."""
+        start_dt, start_udt = self.start_dt, self.start_udt
+        if start_dt is None:
+            # No CSN in any log file; take a single "now" so both fields agree
+            start_dt = datetime.datetime.now(datetime.timezone.utc)
+            start_udt = start_dt.timestamp()
+        return {
+            "start-time": str(start_dt),
+            "utc-start-time": start_udt,
+            "utc-offset": start_dt.utcoffset().total_seconds(),
         }
+
+    def build_log_files(self):
         if self.anonymous:
-            obj['log-files'] = list(range(len(self.logfiles)))
-        else:
-            obj['log-files'] = self.logfiles
-        return obj
+            return list(range(len(self.logfiles)))
+        return self.logfiles
+
+    def write_result(self, path):
+        """Write the result object to path as JSON, formatting records straight from the columns."""
+        record_fmt = b'"%d":{"logtime":%r,"etime":%r,"server_name":%s}'
+        server_name = dumps_json(self.server_name)
+        idxs, logtimes, etimes = self.idx_column, self.logtime_column, self.etime_column
+        with open(path, 'wb', buffering=DSLogParser.READ_BUFFER_SIZE) as f:
+            f.write(dumps_json(self.build_header())[:-1])
+            f.write(b',"lag":{')
+            separator = b''
+            for csn, rows in self.group_rows().items():
+                if len(rows) > 1:
+                    # A later line for the same file replaces the earlier one
+                    rows = {idxs[row]: row for row in rows}.values()
+                records = b','.join(record_fmt % (idxs[row], logtimes[row], etimes[row], server_name) for row in rows)
+                f.write(b'%s%s:{%s}' % (separator, dumps_json(csn), records))
+                separator = b','
+            f.write(b'},"log-files":' + dumps_json(self.build_log_files()) + b'}')
+
+
+def _parse_log_file(job):
+    """Parse a single log file in a worker process."""
+    server_name, idx, logfile = job
+    result = ReplLag({'server_name': server_name, 'logfiles': [logfile], 'anonymous': False})
+    parser = ReplLag.Parser(server_name, idx, logfile, result)
+    parser.parse_file()
+    return result.columns(), result.start_udt, result.start_dt
 
 
 def main():
@@ -198,13 +423,11 @@ def main():
 
     log_parser = ReplLag(module.params)
     log_parser.parse_files()
-    result = log_parser.build_result()
 
     # Write the result to the specified output file in JSON format
     output_file_path = module.params['output_file']
     try:
-        with open(output_file_path, 'w') as output_file:
-            json.dump(result, output_file, indent=4)
+        log_parser.write_result(output_file_path)
     except Exception as e:
         module.fail_json(msg=f"Failed to write to output file {output_file_path}: {e}")
 
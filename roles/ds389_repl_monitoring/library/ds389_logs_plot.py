@@ -108,12 +108,23 @@ EXAMPLES = '''
 
 from ansible.module_utils.basic import AnsibleModule
 import datetime
+import gc
 import json
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
+from operator import itemgetter
 import os
+import sys
 import plotly.graph_objs as go
 import plotly.io as pio
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 class CsnInfo:
     def __init__(self, csn, tz):
@@ -124,10 +135,12 @@ class CsnInfo:
         self.etime = None
         self.replicated_on = {}
         self.csn_history = []
+        self._description = None
 
     def json_parse(self, idx, json_dict):
         self.replicated_on[idx] = json_dict
-        server_name = json_dict['server_name']
+        # Every record of a server repeats its name; share one string object
+        server_name = json_dict['server_name'] = sys.intern(json_dict['server_name'])
         udt = json_dict['logtime']
         etime = float(json_dict['etime'])
         self._update_times(udt, etime, idx)
@@ -154,6 +167,12 @@ class CsnInfo:
         }
 
     def describe_csn(self):
+        # Both the CSV and the HTML output describe every CSN, do it once
+        if self._description is None:
+            self._description = self._describe_csn()
+        return self._description
+
+    def _describe_csn(self):
         try:
             timestamp_hex = self.csn[:8]
             timestamp = datetime.datetime.fromtimestamp(int(timestamp_hex, 16), tz=self.tz).strftime('%Y-%m-%d %H:%M:%S')
@@ -165,6 +184,12 @@ class CsnInfo:
             return f"Failed to describe CSN: {e}"
 
 class LagInfo:
+    # Above this many points the HTML plot is drawn with WebGL, SVG traces
+    # make the browser crawl on large series
+    WEBGL_MIN_POINTS = 5000
+    # Value of each ASCII hex digit, -1 for any other character
+    HEX_DIGITS = np.array([int(chr(c), 16) if chr(c) in '0123456789abcdefABCDEF' else -1 for c in range(128)], dtype=np.int64)
+
     def __init__(self, module_params):
         self.module_params = module_params
         self.utc_offset = None
@@ -172,9 +197,13 @@ class LagInfo:
         self.tz = None
         self.lag = []
         self.index_list = []
+        self._chart_data = None
         self._setup_timezone()
         self.start_time = self._parse_time(module_params.get('start_time', '1970-01-01 00:00:00'))
         self.end_time = self._parse_time(module_params.get('end_time', '9999-12-31 23:59:59'))
+        # The time range filter compares against UTC epoch seconds
+        self.start_udt = self.start_time.timestamp()
+        self.end_udt = self.end_time.timestamp()
 
     def _setup_timezone(self):
         if self.module_params['utc_offset'] is not None:
@@ -195,48 +224,152 @@ class LagInfo:
         except TypeError:
             return "?"
 
-    def is_filtered(self, csninfo):
-        if self.module_params['only_fully_replicated'] and len(self.index_list) != len(csninfo.replicated_on):
-            return True
-        if self.module_params['only_not_replicated'] and len(self.index_list) == len(csninfo.replicated_on):
-            return True
-        if self.module_params['lag_time_lowest'] and csninfo.lag_time[0] <= self.module_params['lag_time_lowest']:
-            return True
-        if self.module_params['etime_lowest'] and csninfo.etime[0] <= self.module_params['etime_lowest']:
-            return True
-        if self.start_time and self.date_from_udt(csninfo.oldest_time[0]) < self.start_time:
-            return True
-        if self.end_time and self.date_from_udt(csninfo.oldest_time[0]) > self.end_time:
-            return True
-        return False
+    def format_udts(self, udts):
+        """Format epoch seconds as '%Y-%m-%d %H:%M:%S' local times, all in one NumPy pass.
+
+        Gives the same strings as date_from_udt(udt).strftime('%Y-%m-%d %H:%M:%S').
+        """
+        # Round to microseconds first like datetime.fromtimestamp, then truncate to seconds
+        seconds = self._local_times(udts).astype('datetime64[s]')
+        return [ts.replace('T', ' ') for ts in np.datetime_as_string(seconds, unit='s').tolist()]
+
+    def isoformat_udts(self, udts):
+        """Format epoch seconds as the ISO strings plotly writes for date_from_udt(udt), all in one NumPy pass."""
+        local = self._local_times(udts)
+        iso = np.datetime_as_string(local, unit='us')
+        # Like isoformat(), plotly leaves out a zero fraction
+        whole = local.view(np.int64) % 1000000 == 0
+        if whole.any():
+            iso[whole] = np.datetime_as_string(local[whole], unit='s')
+        # The UTC offset is written by plotly's JSON engine, orjson rounds
+        # offsets with seconds to whole minutes where isoformat() keeps them
+        suffix = pio.json.to_json_plotly(datetime.datetime.fromtimestamp(0, tz=self.tz))[20:-1]
+        return [ts + suffix for ts in iso.tolist()]
+
+    def _local_times(self, udts):
+        """Return epoch seconds as datetime64[us] local times, rounded like datetime.fromtimestamp."""
+        udts = np.asarray(udts, dtype=np.float64)
+        # fromtimestamp rounds the fraction on its own, half to even
+        seconds = np.trunc(udts)
+        micros = np.round((udts - seconds) * 1e6).astype(np.int64)
+        offset = int(self.tz.utcoffset(None).total_seconds())
+        return ((seconds.astype(np.int64) + offset) * 1000000 + micros).view('datetime64[us]')
+
+    def describe_csns(self):
+        """Fill the describe_csn() cache of the selected CSNs, decoding them with NumPy.
+
+        CSNs whose first 20 characters are not all hex digits are left to
+        describe_csn() itself.
+        """
+        pending = [info for info in self.lag if info._description is None]
+        if not pending:
+            return
+        # Truncating to 20 characters is fine, describe_csn() ignores the rest
+        codes = np.array([info.csn for info in pending], dtype='U20').view(np.uint32).reshape(len(pending), 20)
+        digits = self.HEX_DIGITS[np.minimum(codes, len(self.HEX_DIGITS) - 1)]
+        well_formed = (digits >= 0).all(axis=1)
+        digits = digits[well_formed]
+        timestamps = self.format_udts(digits[:, :8] @ (16 ** np.arange(7, -1, -1)))
+        weights = 16 ** np.arange(3, -1, -1)
+        descriptions = iter([
+            f"{timestamp} | Sequence: {sequence_number} | ID: {identifier} | Sub-sequence: {sub_sequence_number}"
+            for timestamp, sequence_number, identifier, sub_sequence_number in zip(
+                timestamps,
+                (digits[:, 8:12] @ weights).tolist(),
+                (digits[:, 12:16] @ weights).tolist(),
+                (digits[:, 16:20] @ weights).tolist())
+        ])
+        for info, ok in zip(pending, well_formed.tolist()):
+            info._description = next(descriptions) if ok else info._describe_csn()
+
+    def select(self, infos):
+        """Return the CsnInfo entries passing all filters, sorted by their oldest log time."""
+        if not infos:
+            return []
+        oldest = np.fromiter((i.oldest_time[0] for i in infos), dtype=np.float64, count=len(infos))
+        order = np.argsort(oldest, kind='stable')
+        # With the entries sorted by time, the time range is a contiguous slice
+        sorted_oldest = oldest[order]
+        lo = np.searchsorted(sorted_oldest, self.start_udt, side='left')
+        hi = np.searchsorted(sorted_oldest, self.end_udt, side='right')
+        order = order[lo:hi]
+        candidates = [infos[i] for i in order]
+
+        count = len(candidates)
+        mask = np.ones(count, dtype=bool)
+        nb_replicas = len(self.index_list)
+        if self.module_params['only_fully_replicated'] or self.module_params['only_not_replicated']:
+            replicated = np.fromiter((len(i.replicated_on) for i in candidates), dtype=np.int64, count=count)
+            if self.module_params['only_fully_replicated']:
+                mask &= replicated == nb_replicas
+            if self.module_params['only_not_replicated']:
+                mask &= replicated != nb_replicas
+        if self.module_params['lag_time_lowest']:
+            lag_times = np.fromiter((i.lag_time[0] for i in candidates), dtype=np.float64, count=count)
+            mask &= lag_times > self.module_params['lag_time_lowest']
+        if self.module_params['etime_lowest']:
+            etimes = np.fromiter((i.etime[0] for i in candidates), dtype=np.float64, count=count)
+            mask &= etimes > self.module_params['etime_lowest']
+        if mask.all():
+            return candidates
+        return [candidates[i] for i in np.flatnonzero(mask)]
+
+    def chart_data(self):
+        """Return the (log time, lag, etime) series of the selected CSNs.
+
+        Log times are UTC epoch seconds in a float64 array. The series are
+        built once and shared by the PNG and HTML plots.
+        """
+        if self._chart_data is None:
+            oldest = np.fromiter((i.oldest_time[0] for i in self.lag), dtype=np.float64, count=len(self.lag))
+            ydata = [i.lag_time[0] for i in self.lag]
+            edata = [i.etime[0] for i in self.lag]
+            self._chart_data = (oldest, ydata, edata)
+        return self._chart_data
 
     def json_parse(self, fd):
-        json_dict = json.load(fd)
+        # Decoding and walking the document creates hundreds of thousands of
+        # long-lived containers and no garbage cycles. Collections in the
+        # meantime would only rescan them, so pause the collector until the
+        # CsnInfo entries are built.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._json_parse(fd)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _json_parse(self, fd):
+        json_dict = orjson.loads(fd.read()) if HAS_ORJSON else json.load(fd)
         self.utc_offset = json_dict["utc-offset"]
         self.log_files = json_dict["log-files"]
         self.index_list = list(range(len(self.log_files)))
         self._setup_timezone()
+        infos = []
+        # range membership is a bounds check, unlike scanning index_list
+        valid_indexes = range(len(self.log_files))
+        tz = self.tz
         for csn, csninfo in json_dict['lag'].items():
-            info = CsnInfo(csn, self.tz)
+            info = CsnInfo(csn, tz)
             for idx, record in csninfo.items():
                 idx = int(idx)
-                if idx in self.index_list:
+                if idx in valid_indexes:
                     info.json_parse(idx, record)
             info.resolve()
-            if not self.is_filtered(info):
-                self.lag.append(info)
+            infos.append(info)
+        self.lag = self.select(infos)
+        self._chart_data = None
 
     def plot_lag_csv(self, module):
         if not self.lag:
             module.fail_json(msg="No data available to plot.")
 
-        self.lag.sort(key=lambda csninfo: csninfo.oldest_time[0])
-
         with open(self.module_params['csv_output_path'], "w", encoding="utf-8") as csv_file:
             csv_file.write("timestamp,lag,etime,csn,described_csn\n")
-            for idx in range(len(self.lag)):
-                csninfo = self.lag[idx]
-                timestamp = self.date_from_udt(csninfo.oldest_time[0]).strftime('%Y-%m-%d %H:%M:%S')
+            oldest = self.chart_data()[0]
+            self.describe_csns()
+            for csninfo, timestamp in zip(self.lag, self.format_udts(oldest)):
                 described_csn = csninfo.describe_csn()
                 csv_file.write(f"{timestamp},{csninfo.lag_time[0]},{csninfo.etime[0]},{csninfo.csn},{described_csn}\n")
 
@@ -246,29 +379,36 @@ class LagInfo:
         if not self.lag:
             module.fail_json(msg="No data available to plot.")
 
-        self.lag.sort(key=lambda csninfo: csninfo.oldest_time[0])
+        oldest, ydata, edata = self.chart_data()
         starting_time = self.date_from_udt(self.lag[0].oldest_time[0])
 
-        xdata = [self.date_from_udt(i.oldest_time[0]) for i in self.lag]
-        ydata = [i.lag_time[0] for i in self.lag]
-        edata = [i.etime[0] for i in self.lag]
+        # matplotlib converts timezone-aware datetimes one by one, and again
+        # for every line. Hand it one datetime64 array in UTC instead, this is
+        # what the datetimes are converted to anyway.
+        times = np.round(oldest * 1e6).astype(np.int64).view('datetime64[us]')
 
-        plt.figure(figsize=(15, 7))  # Set the figure size to be wide
-        plt.plot(xdata, ydata, label='Replication Lag', color='blue', linestyle='-', linewidth=1.5, marker='o')
-        plt.plot(xdata, edata, label='Elapsed Time', color='green', linestyle='-', linewidth=1.5, marker='x')
+        fig, ax = plt.subplots(figsize=(15, 7))  # Set the figure size to be wide
+        ax.plot(times, ydata, label='Replication Lag', color='blue', linestyle='-', linewidth=1.5, marker='o')
+        ax.plot(times, edata, label='Elapsed Time', color='green', linestyle='-', linewidth=1.5, marker='x')
 
         if self.module_params['repl_lag_threshold'] != 0:
-            plt.axhline(y=self.module_params['repl_lag_threshold'], color='red', linestyle='-', label='Replication Lag Threshold')
-
-        plt.title('Replication Lag Time', fontsize=16)
-        plt.ylabel('Time (s)', fontsize=14)
-        plt.xlabel(f'Log Time (starting on {starting_time})', fontsize=14)
-        plt.xticks(rotation=45)
-        plt.legend(loc='upper right', fontsize=12)
-        plt.grid(True)
-        plt.tight_layout()
-
-        plt.savefig(self.module_params['png_output_path'])
+            ax.axhline(y=self.module_params['repl_lag_threshold'], color='red', linestyle='-', label='Replication Lag Threshold')
+
+        ax.set_title('Replication Lag Time', fontsize=16)
+        ax.set_ylabel('Time (s)', fontsize=14)
+        ax.set_xlabel(f'Log Time (starting on {starting_time})', fontsize=14)
+        # The aware datetimes also gave the axis their timezone, keep placing
+        # and labelling the ticks in utc_offset rather than in UTC
+        locator = mdates.AutoDateLocator(tz=self.tz)
+        ax.xaxis.set_major_locator(locator)
+        ax.xaxis.set_major_formatter(mdates.AutoDateFormatter(locator, tz=self.tz))
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.legend(loc='upper right', fontsize=12)
+        ax.grid(True)
+        fig.tight_layout()
+
+        fig.savefig(self.module_params['png_output_path'])
+        plt.close(fig)
 
         module.log("PNG plot generated successfully")
 
@@ -277,22 +417,29 @@ class LagInfo:
         if not self.lag:
             module.fail_json(msg="No data available to plot.")
 
-        self.lag.sort(key=lambda csninfo: csninfo.oldest_time[0])
+        oldest, ydata, edata = self.chart_data()
+        # plotly would write datetimes out as ISO strings, with their UTC
+        # offset. Build these strings at once rather than a datetime per point.
+        xdata = self.isoformat_udts(oldest)
         starting_time = self.date_from_udt(self.lag[0].oldest_time[0])
 
-        xdata = [self.date_from_udt(i.oldest_time[0]) for i in self.lag]
-        ydata = [i.lag_time[0] for i in self.lag]
-        edata = [i.etime[0] for i in self.lag]
-
         # Generate CSN history text
+        self.describe_csns()
         csn_history_text = []
-        for csninfo in self.lag:
-            history = "<br>".join([f"Server {server_name} - {self.date_from_udt(udt).strftime('%Y-%m-%d %H:%M:%S')}"
-                                   for server_name, udt in sorted(csninfo.csn_history, key=lambda x: x[1])])
+        histories = [sorted(csninfo.csn_history, key=itemgetter(1)) for csninfo in self.lag]
+        # Format the times of all the records at once rather than one by one
+        history_times = iter(self.format_udts([udt for history in histories for _, udt in history]))
+        for csninfo, history in zip(self.lag, histories):
+            history = "<br>".join([f"Server {server_name} - {next(history_times)}" for server_name, _ in history])
             csn_history_text.append(f"CSN: {csninfo.csn} - {csninfo.describe_csn()} - <br>History:<br>{history}")
 
-        trace1 = go.Scatter(x=xdata, y=ydata, mode='lines+markers', name='Replication Lag', text=csn_history_text, hoverinfo='text+x+y')
-        trace2 = go.Scatter(x=xdata, y=edata, mode='lines+markers', name='Elapsed Time', text=csn_history_text, hoverinfo='text+x+y')
+        # go.Scatter validates and deep-copies every point, which took most of
+        # the time on large plots. The values are plain lists of datetimes,
+        # floats and strings, so pass the traces as dicts that plotly writes out
+        # without validation. Keys are in the order plotly's own to_dict() uses.
+        scatter = 'scattergl' if len(xdata) > self.WEBGL_MIN_POINTS else 'scatter'
+        trace1 = dict(hoverinfo='text+x+y', mode='lines+markers', name='Replication Lag', text=csn_history_text, x=xdata, y=ydata, type=scatter)
+        trace2 = dict(hoverinfo='text+x+y', mode='lines+markers', name='Elapsed Time', text=csn_history_text, x=xdata, y=edata, type=scatter)
 
         layout = go.Layout(
             title='Replication Lag Time',
@@ -328,9 +475,10 @@ class LagInfo:
             ]
         )
 
-        fig = go.Figure(data=[trace1, trace2], layout=layout)
+        fig = go.Figure(layout=layout).to_dict()
+        fig['data'] = [trace1, trace2]
 
-        html_content = pio.to_html(fig, full_html=False, include_plotlyjs='cdn')
+        html_content = pio.to_html(fig, full_html=False, include_plotlyjs='cdn', validate=False)
         custom_js = """
         <script>
         document.addEventListener("DOMContentLoaded", function() {
@@ -383,9 +531,13 @@ def main():
         module.fail_json(msg=f"Input file {input_path} not found")
 
     try:
-        with open(input_path, "r", encoding="utf-8") as fd:
+        with open(input_path, "rb") as fd:
             lag_info = LagInfo(module.params)
             lag_info.json_parse(fd)
+            # The parsed entries stay alive while the outputs are generated and
+            # hold no garbage cycles. Keep the collections that matplotlib and
+            # plotly trigger from rescanning them, until the outputs are done.
+            gc.freeze()
             try:
                 if module.params['csv_output_path']:
                     module.log("Generating CSV plot")
@@ -400,6 +552,8 @@ def main():
                     module.fail_json(msg="No output path specified")
             except IndexError:
                 module.fail_json(msg="There's no data to include in the report")
+            finally:
+                gc.unfreeze()
             module.exit_json(changed=True, message="Plot generated successfully")
     except Exception as e:
         module.fail_json(msg=f"Failed to process file {input_path}: {e}")
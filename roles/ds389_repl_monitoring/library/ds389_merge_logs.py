@@ -61,21 +61,34 @@ import json
 from datetime import datetime
 
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps_json(obj):
+    """Serialize obj to compact JSON bytes, using orjson when it is available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
 def merge_jsons(json_list):
     earliest_json = min(json_list, key=lambda x: datetime.fromisoformat(x["start-time"]))
     merged_json = earliest_json.copy()
-    merged_json["log-files"] = []
-    merged_json["lag"] = {}
-
-    for json_data in json_list:
-        merged_json["log-files"].extend(json_data["log-files"])
+    log_files = merged_json["log-files"] = []
+    merged_lag = merged_json["lag"] = {}
 
     for idx, json_data in enumerate(json_list):
-        for key, value in json_data["lag"].items():
-            if key not in merged_json["lag"]:
-                merged_json["lag"][key] = {}
-            for _, inner_value in value.items():
-                merged_json["lag"][key][str(idx)] = inner_value
+        log_files.extend(json_data["log-files"])
+        str_idx = str(idx)
+        for key, record in json_data["lag"]:
+            records = merged_lag.get(key)
+            if records is None:
+                records = merged_lag[key] = {}
+            records[str_idx] = record
 
     return merged_json
 
@@ -87,12 +100,15 @@ def split_json(input_json):
     for log_file in data['log-files']:
         json_obj = common_fields.copy()
         json_obj['log-files'] = [log_file]
-        json_obj['lag'] = {}
+        # merge_jsons re-keys every record by its merged log file index, so
+        # the split lag is kept as plain (csn, record) pairs rather than
+        # {csn: {"0": record}} dicts that are built just to be walked again
+        json_obj['lag'] = []
         json_outputs.append(json_obj)
 
     for lag_id, lag_info in data['lag'].items():
-        file_index = int(list(lag_info.keys())[0])
-        json_outputs[file_index]['lag'][lag_id] = {"0": lag_info[str(file_index)]}
+        file_index = next(iter(lag_info))
+        json_outputs[int(file_index)]['lag'].append((lag_id, lag_info[file_index]))
 
     return json_outputs
 
@@ -106,10 +122,10 @@ def process_file(file_path, module):
         module.fail_json(msg=f"Failed to read {file_path}: {str(e)}")
 
 
-def read_existing_json(output_path):
+def read_existing_output(output_path):
     try:
-        with open(output_path, 'r') as file:
-            return json.load(file)
+        with open(output_path, 'rb') as file:
+            return file.read()
     except FileNotFoundError:
         return None
 
@@ -138,14 +154,16 @@ def main():
                 json_processed_list.append(json_obj)
         merged_result = merge_jsons(json_processed_list)
 
-        existing_json = read_existing_json(output)
+        # The output is always written by dumps_json, so an unchanged merge
+        # gives the same bytes. Comparing them avoids decoding the old file.
+        merged_data = dumps_json(merged_result)
 
-        if existing_json == merged_result:
+        if read_existing_output(output) == merged_data:
             # If existing JSON matches the new merged JSON, exit without making changes.
             module.exit_json(changed=False, message="No changes required, JSON matches existing file.")
         else:
-            with open(output, 'w') as outfile:
-                json.dump(merged_result, outfile, indent=4)
+            with open(output, 'wb') as file:
+                file.write(merged_data)
             module.exit_json(changed=True, message="JSON merged successfully")
 
     except Exception as e: